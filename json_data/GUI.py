@@ -2,19 +2,22 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 import json
-from typing import Dict, List
+import logging
+from typing import Callable, Dict, List
 
-import requests
+from pham_io import (
+    download_all_pham_jsons,
+    find_local_json,
+    load_pham_json,
+    local_json_path,
+)
 
-# constants
-
-# main website url
-BASE_URL = "http://phages.wustl.edu/starterator/json/"
+logger = logging.getLogger(__name__)
 
-# locally stored JSON file location
-OUTPUT_DIR = Path(__file__).parent / "json_data"
+# constants
 
 # pham_ids.txt written by fetch, contains pham numbers to all phams
 PHAM_IDS_FILE = Path(__file__).parent / "pham_ids.txt"
@@ -22,90 +25,59 @@ PHAM_IDS_FILE = Path(__file__).parent / "pham_ids.txt"
 # load pham #s from PHAM_IDS_FILE into memory
 def load_pham_ids() -> list[int]:
     """Load pham IDs from PHAM_IDS_FILE (ignoring comments/blank lines)."""
-    if not PHAM_IDS_FILE.exists():
+    try:
+        mtime_ns = PHAM_IDS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
         print(f"{PHAM_IDS_FILE} does not exist. Run fetch_pham_ids.py first.")
         return []
 
-    ids: list[int] = []
-    for line in PHAM_IDS_FILE.read_text().splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        try:
-            ids.append(int(line))
-        except ValueError:
-            print(f"WARNING: ignoring invalid line in {PHAM_IDS_FILE}: {line!r}")
-
-    ids = sorted(set(ids))
-    print(f"Loaded {len(ids)} pham IDs from {PHAM_IDS_FILE}")
-    return ids
-
-
-def get_pham_url(pham_id: int) -> str:
-    """Return the JSON URL for a given pham."""
-    return f"{BASE_URL}{pham_id}.json"
-
-
-def download_pham_json(pham_id: int, force: bool = False) -> Path | None:
-    """
-    Ensure JSON for this pham is present locally in OUTPUT_DIR.
-
-    - If it exists and force=False, just return the path.
-    - Otherwise, download it from the server into OUTPUT_DIR.
-
-    Returns the local Path if successful, else None.
-    """
-    OUTPUT_DIR.mkdir(exist_ok=True)
-    json_path = OUTPUT_DIR / f"{pham_id}.json"
+    # the file only changes when fetch_pham_ids.py rewrites it, so reuse the
+    # last parse until its mtime moves
+    return list(_parse_pham_ids(mtime_ns))
 
-    if json_path.exists() and not force:
-        return json_path
 
-    url = get_pham_url(pham_id)
-    print(f"Downloading {url} ...")
+@lru_cache(maxsize=1)
+def _parse_pham_ids(mtime_ns: int) -> tuple[int, ...]:
+    """Parse PHAM_IDS_FILE; mtime_ns is only the cache key."""
+    text = PHAM_IDS_FILE.read_text()
 
+    # fast path: a plain file of one number per line parses in one go; fall
+    # back to the line-by-line loop only if there are comments, blank lines or
+    # bad lines (e.g. "12 34") to report
     try:
-        resp = requests.get(url, timeout=15)
-    except requests.RequestException as e:
-        print(f"  ERROR: could not download {url}: {e}")
-        return None
-
-    if resp.status_code != 200:
-        print(f"  ERROR: server returned status {resp.status_code} for {url}")
-        return None
-
-    # Validate JSON before saving
-    try:
-        _ = resp.json()
-    except json.JSONDecodeError as e:
-        print(f"  ERROR: response from {url} was not valid JSON: {e}")
-        return None
-
-    json_path.write_text(resp.text, encoding="utf-8")
-    print(f"  Saved to {json_path}")
-    return json_path
-
-
-def load_pham_json(path: Path) -> dict:
-    """Load one pham JSON file and return the parsed dict."""
-    with path.open(encoding="utf-8") as f:
-        return json.load(f)
+        unique_ids = set(map(int, text.splitlines()))
+    except ValueError:
+        unique_ids = set()
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                unique_ids.add(int(line))
+            except ValueError:
+                print(f"WARNING: ignoring invalid line in {PHAM_IDS_FILE}: {line!r}")
 
+    ids = tuple(sorted(unique_ids))
+    print(f"Loaded {len(ids)} pham IDs from {PHAM_IDS_FILE}")
+    return ids
 
 
-def update_all_local_jsons(pham_ids: list[int], *, force: bool = True) -> None:
+def update_all_local_jsons(
+    pham_ids: list[int],
+    *,
+    force: bool = True,
+    progress: Callable[[int, int], None] | None = None,
+) -> None:
     """
     Re-download JSON files for all given pham IDs into OUTPUT_DIR.
 
     called with "update local JSON files".
+    progress(done, total) is forwarded to download_all_pham_jsons.
     """
-    print(f"\nRefreshing JSON for {len(pham_ids)} phams (force={force})...")
-    success = 0
-    for pham_id in pham_ids:
-        path = download_pham_json(pham_id, force=force)
-        if path is not None:
-            success += 1
-    print(f"Finished refresh: {success}/{len(pham_ids)} phams downloaded successfully.\n")
+    logger.info("Refreshing JSON for %d phams (force=%s)...", len(pham_ids), force)
+    paths = download_all_pham_jsons(pham_ids, force=force, progress=progress)
+    success = sum(1 for path in paths.values() if path is not None)
+    logger.info("Finished refresh: %d/%d phams downloaded successfully.", success, len(pham_ids))
 
 
 
@@ -122,33 +94,39 @@ def load_all_pham_data(pham_ids: list[int], use_network: bool) -> dict[int, dict
     """
     all_data: dict[int, dict] = {}
     total = len(pham_ids)
-    print(f"\nLoading JSON data into memory for {total} phams (use_network={use_network})...")
+    logger.info("Loading JSON data into memory for %d phams (use_network=%s)...", total, use_network)
+
+    # fetch anything missing up front so network latency overlaps across phams
+    if use_network:
+        downloaded = download_all_pham_jsons(pham_ids)  # cached download
 
     for idx, pham_id in enumerate(pham_ids, start=1):
         # Decide how to get the local JSON path
         if use_network:
-            path = download_pham_json(pham_id)  # cached download
+            path = downloaded[pham_id]
             if path is None:
-                print(f"  Skipping pham {pham_id}: download failed.")
+                logger.warning("  Skipping pham %d: download failed.", pham_id)
                 continue
         else:
-            path = OUTPUT_DIR / f"{pham_id}.json"
-            if not path.exists():
-                print(f"  Skipping pham {pham_id}: local file missing at {path}")
+            path = find_local_json(pham_id)
+            if path is None:
+                logger.warning(
+                    "  Skipping pham %d: local file missing at %s", pham_id, local_json_path(pham_id)
+                )
                 continue
 
         # Load JSON into memory
         try:
             data = load_pham_json(path)
-        except json.JSONDecodeError as e:
-            print(f"  ERROR: {path} is not valid JSON for pham {pham_id}: {e}")
+        except (json.JSONDecodeError, OSError, EOFError) as e:
+            logger.error("  ERROR: %s is not valid JSON for pham %d: %s", path, pham_id, e)
             continue
 
         all_data[pham_id] = data
 
         # progress indicator for large sets
         if idx % 100 == 0 or idx == total:
-            print(f"  Loaded {idx}/{total} phams...")
+            logger.info("  Loaded %d/%d phams...", idx, total)
 
-    print(f"Done. Loaded JSON for {len(all_data)}/{total} phams into memory.\n")
-    return all_data
\ No newline at end of file
+    logger.info("Done. Loaded JSON for %d/%d phams into memory.", len(all_data), total)
+    return all_data
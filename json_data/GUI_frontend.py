@@ -1,6 +1,8 @@
+import logging
 import sys
 
 import PySide6
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtWidgets import QApplication
 
 
@@ -23,6 +25,37 @@ import verify_json
 from GUI import load_pham_ids, update_all_local_jsons
 
 
+class WorkerSignals(QObject):
+    """Signals a Worker uses to report back to the GUI thread."""
+    progress = Signal(int, int)   # (done, total)
+    finished = Signal(object)     # return value of the job
+    error = Signal(str)
+
+
+class Worker(QRunnable):
+    """
+    Run a blocking backend call on the Qt thread pool.
+
+    The call gets a progress=callback keyword that emits signals.progress,
+    so the backend can report progress without touching any widgets.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, progress=self.signals.progress.emit, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
 class StarteratorMainWindow(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -89,6 +122,11 @@ class StarteratorMainWindow(QMainWindow):
         self.update_button.clicked.connect(self.on_update_clicked)
         self.run_button.clicked.connect(self.on_run_clicked)
 
+        # backend work runs off the GUI thread; keep a reference while it runs
+        self.thread_pool = QThreadPool.globalInstance()
+        self.current_worker: Worker | None = None
+        self.worker_texts = ("", "", "")  # (running, finished, error prefix)
+
     # helpers for reading UI
     def get_current_settings_from_ui(self):
         """
@@ -110,6 +148,36 @@ class StarteratorMainWindow(QMainWindow):
             "refresh_all": refresh_all,
         }
 
+    def start_worker(self, worker: Worker, status_text: str, done_text: str, error_prefix: str):
+        """Disable the buttons, run the worker, and restore the UI when it ends."""
+        self.update_button.setEnabled(False)
+        self.run_button.setEnabled(False)
+        self.status_label.setText(status_text)
+        self.worker_texts = (status_text, done_text, error_prefix)
+
+        # bound methods on this window, so Qt queues the calls onto the GUI thread
+        worker.signals.progress.connect(self.on_worker_progress)
+        worker.signals.finished.connect(self.on_worker_finished)
+        worker.signals.error.connect(self.on_worker_error)
+
+        self.current_worker = worker
+        self.thread_pool.start(worker)
+
+    def finish_worker(self, text: str):
+        self.status_label.setText(text)
+        self.update_button.setEnabled(True)
+        self.run_button.setEnabled(True)
+        self.current_worker = None
+
+    def on_worker_progress(self, done: int, total: int):
+        self.status_label.setText(f"{self.worker_texts[0]} {done}/{total}")
+
+    def on_worker_finished(self, _result):
+        self.finish_worker(self.worker_texts[1])
+
+    def on_worker_error(self, message: str):
+        self.finish_worker(f"{self.worker_texts[2]}: {message}")
+
     # slots
 
     def on_update_clicked(self):
@@ -117,24 +185,22 @@ class StarteratorMainWindow(QMainWindow):
         Called when 'Update local JSONs (redownload all)' is pressed.
         Uses the backend to reload JSONs for all pham IDs.
         """
-        self.status_label.setText("Updating local JSON files...")
-        self.repaint()  # force label refresh
-
         pham_ids = load_pham_ids()
         if not pham_ids:
             self.status_label.setText("No pham IDs found (check pham_ids.txt).")
             return
 
-        try:
-            update_all_local_jsons(pham_ids, force=True)
-            self.status_label.setText("Local JSONs updated successfully.")
-        except Exception as e:
-            self.status_label.setText(f"Error updating JSONs: {e}")
+        self.start_worker(
+            Worker(update_all_local_jsons, pham_ids, force=True),
+            "Updating local JSON files...",
+            "Local JSONs updated successfully.",
+            "Error updating JSONs",
+        )
 
     def on_run_clicked(self):
         """
         Called when 'Run Verification' is pressed.
-        Sets options on verify_json and then calls verify_json.main().
+        Sets options on verify_json and then runs verify_json.main() on a worker.
         """
         settings = self.get_current_settings_from_ui()
 
@@ -146,19 +212,16 @@ class StarteratorMainWindow(QMainWindow):
 
         mode = "network" if settings["use_network"] else "local"
         refresh_text = "with refresh" if settings["refresh_all"] else "no refresh"
-        self.status_label.setText(f"Running verification ({mode}, {refresh_text})...")
-        self.repaint()
-
-        try:
-            # NOTE: This will block the GUI until it finishes.
-            # Later you can move this into a QThread if you want it non-blocking.
-            verify_json.main()
-            self.status_label.setText("Verification completed.")
-        except Exception as e:
-            self.status_label.setText(f"Error during verification: {e}")
+        self.start_worker(
+            Worker(verify_json.main),
+            f"Running verification ({mode}, {refresh_text})...",
+            "Verification completed.",
+            "Error during verification",
+        )
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     app = QApplication(sys.argv)
     window = StarteratorMainWindow()
     window.show()
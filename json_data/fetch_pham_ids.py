@@ -2,7 +2,7 @@ from pathlib import Path
 import re
 import json
 
-import requests
+from pham_io import SESSION
 
 
 # Base URL where Starterator JSONs live
@@ -11,6 +11,9 @@ url = "http://phages.wustl.edu/starterator/json/"
 # text file location
 phams_file = Path(__file__).parent / "pham_ids.txt"
 
+# directory listing entries like href="12345.json"
+_HREF_RE = re.compile(rb'href=[\'"](\d+)\.json[\'"]')
+
 
 def fetch_pham_ids_from_server() -> list[int]:
     """
@@ -18,20 +21,15 @@ def fetch_pham_ids_from_server() -> list[int]:
     and return the list of pham IDs as integers.
     """
     print(f"Fetching pham list from {url} ...")
-    resp = requests.get(url, timeout=20)
-
-    resp.raise_for_status()
-
-    html = resp.text
-
-    # Look for href="12345.json" or href='12345.json'
+    # Look for href="12345.json" or href='12345.json', matching raw bytes
+    # line by line so the full listing is never held in memory
     ids: set[int] = set()
-    for match in re.finditer(r'href=[\'"](\d+)\.json[\'"]', html):
-        pham_str = match.group(1)
-        try:
-            ids.add(int(pham_str))
-        except ValueError:
-            print(f"  WARNING: could not parse pham id {pham_str!r}")
+    with SESSION.get(url, timeout=20, stream=True) as resp:
+        resp.raise_for_status()
+
+        for line in resp.iter_lines():
+            for match in _HREF_RE.finditer(line):
+                ids.add(int(match.group(1)))
 
     ids_list = sorted(ids)
     print(f"Found {len(ids_list)} pham IDs on server.")
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+import gzip
+import json
+import logging
+import os
+import threading
+import zlib
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # optional: much faster JSON parsing
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# constants
+
+# main website url
+BASE_URL = "http://phages.wustl.edu/starterator/json/"
+
+# locally stored JSON file location (gzip-compressed pham files)
+OUTPUT_DIR = Path(__file__).parent / "json_data"
+
+# number of pham JSONs downloaded in parallel
+MAX_WORKERS = 16
+
+# ETag / Last-Modified per pham, used to skip unchanged files on refresh
+VALIDATORS_FILE = OUTPUT_DIR / ".etags.json"
+
+_validators: dict[str, list[str | None]] | None = None
+_validators_dirty = False
+_validators_lock = threading.Lock()
+
+
+# shared HTTP session so every pham download reuses keep-alive connections
+# instead of paying a fresh TCP handshake per request; the pool holds one
+# socket per download worker and blocks rather than opening throwaway extras
+SESSION = requests.Session()
+
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=MAX_WORKERS,
+    pool_block=True,
+    max_retries=Retry(total=3, backoff_factor=0.3),
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+
+def json_loads(data: bytes):
+    """
+    Parse pham JSON, with orjson when it is installed.
+
+    orjson rejects some input the stdlib accepts (NaN/Infinity literals,
+    floats that overflow a double), so those fall back to json.loads. orjson
+    also turns integers wider than 64 bits into floats; pham files only hold
+    small counts and start numbers, so that does not matter here.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+# Return the JSON URL for a given pham (bound str.format, no per-call f-string)
+get_pham_url = (BASE_URL + "{}.json").format
+
+
+@lru_cache(maxsize=None)
+def local_json_path(pham_id: int) -> Path:
+    """Return where the gzipped JSON for a given pham is stored in OUTPUT_DIR."""
+    return OUTPUT_DIR / f"{pham_id}.json.gz"
+
+
+def find_local_json(pham_id: int) -> Path | None:
+    """
+    Return the local gzipped JSON for a pham, or None if there isn't one.
+
+    A plain {pham_id}.json left by older versions is gzipped in place on first
+    use, so existing caches keep working offline.
+    """
+    json_path = local_json_path(pham_id)
+    if json_path.exists():
+        return json_path
+
+    legacy_path = OUTPUT_DIR / f"{pham_id}.json"
+    if not legacy_path.exists():
+        return None
+
+    try:
+        _write_atomic(json_path, gzip.compress(legacy_path.read_bytes(), compresslevel=1))
+        legacy_path.unlink()
+    except OSError as e:
+        logger.error("  ERROR: could not convert %s to gzip: %s", legacy_path, e)
+        return None
+    logger.debug("Converted %s to %s", legacy_path, json_path)
+    return json_path
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write data to a temp file next to path, then swap it into place."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # don't leave a half-written .tmp file behind
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _get_validators() -> dict[str, list[str | None]]:
+    """Return the in-memory validator cache, loading VALIDATORS_FILE on first use."""
+    global _validators
+    with _validators_lock:
+        if _validators is None:
+            try:
+                _validators = json.loads(VALIDATORS_FILE.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                _validators = {}
+        return _validators
+
+
+def save_validators() -> None:
+    """Write the in-memory ETag / Last-Modified cache back to VALIDATORS_FILE if it changed."""
+    global _validators_dirty
+    with _validators_lock:
+        if _validators is None or not _validators_dirty:
+            return
+        OUTPUT_DIR.mkdir(exist_ok=True)
+        _write_atomic(VALIDATORS_FILE, json.dumps(_validators).encode("utf-8"))
+        _validators_dirty = False
+
+
+def download_pham_json(pham_id: int, force: bool = False) -> Path | None:
+    """
+    Ensure JSON for this pham is present locally (gzipped) in OUTPUT_DIR.
+
+    Same as the bulk download path for a single pham, and also saves any new
+    ETag / Last-Modified to VALIDATORS_FILE straight away.
+
+    Returns the local Path if successful, else None.
+    """
+    path = _download_pham_json(pham_id, force=force)
+    save_validators()
+    return path
+
+
+def _download_pham_json(pham_id: int, force: bool = False) -> Path | None:
+    """
+    Ensure JSON for this pham is present locally (gzipped) in OUTPUT_DIR.
+
+    - If it exists and force=False, just return the path.
+    - If it exists and force=True, send a conditional GET and keep the
+      local file when the server answers 304 Not Modified.
+    - Otherwise, download it from the server into OUTPUT_DIR.
+
+    Only updates the in-memory validator cache; callers save it.
+
+    Returns the local Path if successful, else None.
+    """
+    global _validators_dirty
+
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    json_path = local_json_path(pham_id)
+    have_local = find_local_json(pham_id) is not None
+
+    if have_local and not force:
+        return json_path
+
+    url = get_pham_url(pham_id)
+    logger.debug("Downloading %s ...", url)
+
+    headers = {}
+    if have_local:
+        etag, last_modified = _get_validators().get(str(pham_id), (None, None))
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    try:
+        resp = SESSION.get(url, headers=headers, timeout=15, stream=True)
+    except requests.RequestException as e:
+        logger.error("  ERROR: could not download %s: %s", url, e)
+        return None
+
+    with resp:
+        if resp.status_code == 304:
+            logger.debug("Not modified; keeping %s", json_path)
+            return json_path
+
+        if resp.status_code != 200:
+            logger.error("  ERROR: server returned status %d for %s", resp.status_code, url)
+            return None
+
+        try:
+            if resp.headers.get("Content-Encoding", "").lower() == "gzip":
+                # already gzipped on the wire; store those bytes as they are
+                body = resp.raw.read(decode_content=False)
+                head = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, 64)
+            else:
+                head = resp.content[:64]
+                body = gzip.compress(resp.content, compresslevel=1)
+        except (requests.RequestException, Urllib3HTTPError, zlib.error) as e:
+            logger.error("  ERROR: could not download %s: %s", url, e)
+            return None
+
+    # Cheap sanity check before saving; full parsing happens in load_pham_json
+    if head.lstrip()[:1] not in (b"{", b"["):
+        logger.error("  ERROR: response from %s does not look like JSON", url)
+        return None
+
+    _write_atomic(json_path, body)
+    logger.debug("Saved to %s", json_path)
+
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    validators = _get_validators()
+    with _validators_lock:
+        if etag or last_modified:
+            validators[str(pham_id)] = [etag, last_modified]
+            _validators_dirty = True
+        elif validators.pop(str(pham_id), None) is not None:
+            # new body came without validators; the old ones no longer match it
+            _validators_dirty = True
+
+    return json_path
+
+
+def load_pham_json(path: Path) -> dict:
+    """
+    Load one gzipped pham JSON file and return the parsed dict.
+
+    Raises json.JSONDecodeError for bad JSON and OSError/EOFError for a
+    missing, corrupt or truncated file.
+    """
+    try:
+        raw = gzip.decompress(path.read_bytes())
+    except zlib.error as e:
+        # corrupt deflate data; report it like any other bad gzip file
+        raise gzip.BadGzipFile(f"{path}: {e}") from e
+    return json_loads(raw)
+
+
+def download_all_pham_jsons(
+    pham_ids: list[int],
+    *,
+    force: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[int, Path | None]:
+    """
+    Run _download_pham_json for every pham ID on a thread pool, saving the
+    validator cache once at the end rather than after every pham as
+    download_pham_json does.
+
+    If given, progress(done, total) is called alongside each progress log line.
+
+    Returns a dict mapping pham_id -> local Path (None if the download failed).
+    """
+    paths: dict[int, Path | None] = {}
+
+    # already-cached files don't need a worker; only network fetches go on the pool
+    to_fetch: list[int] = []
+    for pham_id in pham_ids:
+        json_path = None if force else find_local_json(pham_id)
+        if json_path is not None:
+            paths[pham_id] = json_path
+        else:
+            to_fetch.append(pham_id)
+
+    if not to_fetch:
+        return paths
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(to_fetch))) as executor:
+        futures = {
+            executor.submit(_download_pham_json, pham_id, force=force): pham_id
+            for pham_id in to_fetch
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            paths[futures[future]] = future.result()
+
+            # progress indicator for large sets
+            if done % 100 == 0 or done == len(futures):
+                logger.info("  Fetched %d/%d phams...", done, len(futures))
+                if progress is not None:
+                    progress(done, len(futures))
+
+    save_validators()
+    return paths
@@ -1,10 +1,19 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Callable
 import json
-
-import requests  # install in your project env: pip install requests
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import time
 
 import random
 
+from pham_io import download_all_pham_jsons, load_pham_json
 from GUI import (
     load_pham_ids,
     load_all_pham_data,
@@ -14,10 +23,7 @@ from GUI import (
 
 
 
-url = "http://phages.wustl.edu/starterator/json/"
-
-# Folder where JSON files are stored locally
-OUTPUT_DIR = Path(__file__).parent / "json_data"
+logger = logging.getLogger(__name__)
 
 # pham_ids.txt written by your "fetch" script
 pham_ids_file = Path(__file__).parent / "pham_ids.txt"
@@ -27,65 +33,24 @@ phams_amount: int | None = 500  # change this as you like
 
 chunk_size = 20
 
+# phams handed to each verification process at a time; runs too small to
+# give two processes a full batch are checked in-process instead
+check_batch_size = 32
+
 # backend toggles that the GUI_frontend will overwrite
 use_network: bool = True        # True = download/cached; False = local-only
 refresh_all: bool = False       # True = redownload selected JSONs before run
 
 
-# get jsons
-
-def get_pham_url(pham_id: int):
-    """makes URL given pham."""
-    return "http://phages.wustl.edu/starterator/json/" + str(pham_id) + ".json"
-
-# checks to see if json file is local
-
-def download_pham_json(pham_id: int, force: bool = False) -> Path | None:
-    """
-    Ensure JSON for this pham is present locally.
-    - If it exists and force=False, just return the path.
-    - Otherwise, download it from the server into OUTPUT_DIR.
-
-    Returns the local Path if successful, else None.
-    """
-    OUTPUT_DIR.mkdir(exist_ok=True)
-    downloaded_json_path = OUTPUT_DIR / str(str(pham_id) + ".json")
-
-    if downloaded_json_path.exists() and not force:
-        return downloaded_json_path
-
-    url = get_pham_url(pham_id)
-    print("Downloading" + str(url) + "...")
-    try:
-        resp = requests.get(url, timeout=15)
-    except requests.RequestException as e:
-        print(f"  ERROR: could not download {url}: {e}")
-        return None
-
-#200 status is "OK"
-
-    if resp.status_code != 200:
-        print(f"  ERROR: server returned status {resp.status_code} for {url}")
-        return None
-
-    try:
-        _ = resp.json()  # validate JSON
-    except json.JSONDecodeError as e:
-        print(f"  ERROR: response from {url} was not valid JSON: {e}")
-        return None
-
-    downloaded_json_path.write_text(resp.text, encoding="utf-8")
-    print(f"  Saved to {downloaded_json_path}")
-    return downloaded_json_path
-
-
-def load_pham_json(path: Path) -> dict:
-    """Load one pham JSON file and return the parsed dict."""
-    with path.open() as f:
-        return json.load(f)
+# conservation calculations
 
+def count_starts(data: dict) -> Counter[int]:
+    """Count how many genes list each start in AvailableStarts."""
+    present_counts: Counter[int] = Counter()
+    for gene in data["Genes"]:
+        present_counts.update(gene["AvailableStarts"])
+    return present_counts
 
-# conservation calculations
 
 def recompute_conservation(data: dict) -> dict:
     """
@@ -95,19 +60,14 @@ def recompute_conservation(data: dict) -> dict:
     Returns a dict with string keys like the JSON: {"1": 0.2, "2": 0.8, ...}
     """
     member_count = data["MemberCount"]
-    present_counts: dict[int, int] = {}
-
-    # Count how many genes list each start in AvailableStarts
-    for gene in data["Genes"]:
-        for start_num in gene["AvailableStarts"]:
-            present_counts[start_num] = present_counts.get(start_num, 0) + 1
+    present_counts = count_starts(data)
 
-    # Convert to fractions and string keys to match JSON format
-    recomputed = {
-        str(start_num): present_counts[start_num] / member_count
-        for start_num in sorted(present_counts.keys())
+    # Convert to fractions and string keys to match JSON format; no sort needed,
+    # compare_conservation orders its mismatches itself
+    return {
+        str(start_num): count / member_count
+        for start_num, count in present_counts.items()
     }
-    return recomputed
 
 
 def compare_conservation(data: dict, tol: float = 1e-6):
@@ -130,12 +90,11 @@ def compare_conservation(data: dict, tol: float = 1e-6):
     recomputed: dict[str, float] = recompute_conservation(data)
 
     mismatches = []
-    all_keys = sorted(set(json_cons.keys()) | set(recomputed.keys()), key=int)
-
-    for k in all_keys:
-        jc = json_cons.get(k)
-        rc = recomputed.get(k)
 
+    # one pass over the JSON side, popping matches out of the (local)
+    # recomputed dict so whatever is left afterwards is missing from the JSON
+    for k, jc in json_cons.items():
+        rc = recomputed.pop(k, None)
         if jc is None or rc is None:
             mismatches.append({
                 "start": k,
@@ -143,21 +102,57 @@ def compare_conservation(data: dict, tol: float = 1e-6):
                 "json": jc,
                 "recomputed": rc,
             })
-        else:
-            if abs(jc - rc) > tol:
-                mismatches.append({
-                    "start": k,
-                    "issue": "value_mismatch",
-                    "json": jc,
-                    "recomputed": rc,
-                })
+        elif abs(jc - rc) > tol:
+            mismatches.append({
+                "start": k,
+                "issue": "value_mismatch",
+                "json": jc,
+                "recomputed": rc,
+            })
+
+    # whatever is left was never listed in the JSON
+    for k, rc in recomputed.items():
+        mismatches.append({
+            "start": k,
+            "issue": "missing_in_one_side",
+            "json": None,
+            "recomputed": rc,
+        })
+
+    # only the (usually few) mismatches need ordering by start number
+    mismatches.sort(key=lambda m: int(m["start"]))
 
     return pham_name, mismatches
 
 
+def check_one(path: Path) -> tuple[str | None, list[dict] | None, str | None]:
+    """
+    Load one pham JSON from disk and compare its Conservation values.
+
+    Runs in a worker process, so it takes the file path rather than the parsed
+    data. Returns (pham_name, mismatches, error); error is set (and the other
+    two are None) if the file is not valid gzipped JSON.
+    """
+    try:
+        data = load_pham_json(path)
+    except (json.JSONDecodeError, OSError, EOFError) as e:
+        return None, None, str(e)
+
+    pham_name, mismatches = compare_conservation(data)
+    return pham_name, mismatches, None
+
+
 #main
 
-def main():
+def main(progress: Callable[[int, int], None] | None = None):
+    """
+    Sample phams, download them if needed and check their Conservation values.
+
+    If given, progress(done, total) is called while downloading (see
+    download_all_pham_jsons) and then after every chunk_size verified phams.
+    """
+    start_time = time.perf_counter()
+
     pham_ids = load_pham_ids()
     if not pham_ids:
         return
@@ -183,46 +178,67 @@ def main():
     total = 0
     bad = 0
 
-    for pham_id in pham_ids:
-        total += 1
-        path = download_pham_json(pham_id)  # skips if already cached
-        if path is None:
-            print(f"Skipping pham {pham_id}: download failed.")
-            continue
-
-        try:
-            data = load_pham_json(path)
-        except json.JSONDecodeError as e:
-            print(f"ERROR: {path} is not valid JSON: {e}")
-            continue
-
-        pham_name, mismatches = compare_conservation(data)
-
-        if mismatches:
-            bad += 1
-            print(f"\n=== {pham_name or pham_id} ({path.name}) has {len(mismatches)} mismatch(es) ===")
-            for m in mismatches:
-                print(
-                    f"  start {m['start']}: {m['issue']} "
-                    f"json={m['json']} recomputed={m['recomputed']}"
-                )
-        else:
-            print(f"{pham_name or pham_id} ({path.name}): all Conservation values match.")
-
-        # gives update after each chunk is run. Chunk size set by var at the beginning of the code.
-        if total % chunk_size == 0:
-            print(
-                f"\n--- Status: processed {total} / {len(pham_ids)} phams; "
-                f"{bad} with mismatches so far. ---"
-            )
+    # download in parallel up front; skips anything already cached
+    downloaded = download_all_pham_jsons(pham_ids, progress=progress)
+    paths = [downloaded[pham_id] for pham_id in pham_ids]
+
+    # verification is pure CPU work, so spread it over processes; "spawn"
+    # because the GUI calls this from a worker thread, and forking a
+    # multi-threaded process can deadlock the child. Spawned children re-import
+    # everything, so only use as many as there are full batches of work.
+    checkable = [path for path in paths if path is not None]
+    workers = min(os.cpu_count() or 1, math.ceil(len(checkable) / check_batch_size))
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    else:
+        pool = nullcontext()
 
-    print(f"\nChecked {total} phams; {bad} mismatches.")
+    with pool as executor:
+        if executor is not None:
+            results = executor.map(check_one, checkable, chunksize=check_batch_size)
+        else:
+            results = map(check_one, checkable)
+
+        for pham_id, path in zip(pham_ids, paths):
+            total += 1
+            if path is None:
+                logger.warning("Skipping pham %d: download failed.", pham_id)
+                continue
+
+            pham_name, mismatches, error = next(results)
+            if error is not None:
+                logger.error("ERROR: %s is not valid JSON: %s", path, error)
+                continue
+
+            if mismatches:
+                bad += 1
+                print(f"\n=== {pham_name or pham_id} ({path.name}) has {len(mismatches)} mismatch(es) ===")
+                for m in mismatches:
+                    print(
+                        f"  start {m['start']}: {m['issue']} "
+                        f"json={m['json']} recomputed={m['recomputed']}"
+                    )
+            else:
+                logger.debug("%s (%s): all Conservation values match.", pham_name or pham_id, path.name)
+
+            # gives update after each chunk is run. Chunk size set by var at the beginning of the code.
+            if total % chunk_size == 0:
+                logger.info(
+                    "--- Status: processed %d / %d phams; %d with mismatches so far. ---",
+                    total, len(pham_ids), bad,
+                )
+                if progress is not None:
+                    progress(total, len(pham_ids))
 
-    print(sampled_ids)
+    elapsed = time.perf_counter() - start_time
+    logger.info("Checked %d phams; %d mismatches. Finished in %.2fs.", total, bad, elapsed)
 
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     main()
 
 